@@ -14,11 +14,13 @@ Author: Naccini Marco
 Version: 2.0.0
 """
 
+import os
+import mmap
 import re
-import csv
 import argparse
-from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+import functools
+from typing import Callable, Dict, List, Set, Tuple, Optional, Any
+from dataclasses import dataclass, field
 import datetime
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -27,6 +29,82 @@ from enum import Enum
 
 TIME_STAMP_OUTPUT = "%d.%m.%Y %H:%M:%S.%f"
 
+# Log parse warnings are counted, only the first ones are printed
+MAX_PARSE_WARNINGS_SHOWN = 50
+
+# Signals up to this size get a table of their formatted values, indexed by raw value
+FIELD_LUT_MAX_BITS = 8
+
+# CSV output
+CSV_LINE_TERMINATOR = ';\r\n'
+CSV_BATCH_ROWS = 10000          # Rows joined and written with a single write()
+
+# Regex pattern for DBC parsing, matching message and signal lines in one pass
+_DBC_RE = re.compile(
+    r'^[ \t]*(?:'
+    # Message: BO_ <ID> <MessageName>: <DLC> <Sender>
+    r'BO_[ \t]+(?P<id>\d+)[ \t]+(?P<mname>\w+)[ \t]*:[ \t]*(?P<dlc>\d+)[ \t]+\w+'
+    r'|'
+    # Signal: SG_ <SignalName> : <StartBit>|<Size>@<Endianness><Sign> (<Factor>,<Offset>) [<Min>|<Max>] "<Unit>" <Receivers>
+    r'SG_[ \t]+(?P<sname>\w+)[ \t]*:[ \t]*(?P<sb>\d+)\|(?P<sz>\d+)@(?P<end>[01])(?P<sgn>[+-])[ \t]*'
+    r'\([ \t]*(?P<f>[-+]?\d*\.?\d*)[ \t]*,[ \t]*(?P<o>[-+]?\d*\.?\d*)[ \t]*\)[ \t]*'
+    r'\[[ \t]*(?P<mn>[-+]?\d*\.?\d*)[ \t]*\|[ \t]*(?P<mx>[-+]?\d*\.?\d*)[ \t]*\][ \t]*'
+    r'"(?P<u>[^"\n]*)"'
+    r')', re.MULTILINE)
+
+# Log files are parsed as bytes (memory mapped), all log patterns are bytes patterns
+
+# File type detection patterns
+_FILE_TYPE_RES = [
+    re.compile(rb'\*\*\*BUSMASTER Ver 3\.2\.2\*\*\*'),
+    re.compile(rb';\s+Generated by PCAN-View.*'),
+    re.compile(rb'# Logger type: CL2000')
+]
+
+# Start date/time patterns for each format
+_START_DATE_RES = [
+    re.compile(rb'^\*\*\*START DATE AND TIME (\d+:\d+:\d+)[ \t]+.*\*\*\*', re.MULTILINE),  # BusMaster
+    re.compile(rb';\s+Start time:\s+(\d{2}/\d{2}/\d+ \d{2}:\d{2}:\d+\.\d+)\..*'),  # PCAN-View
+    re.compile(rb'')  # CL2000 (timestamp is absolute)
+]
+
+# Log line patterns for each format, anchored to a single line so that they
+# can be run with finditer() over the whole file content
+_LOG_RES = [
+    # BusMaster Ver 3.2.2
+    re.compile(rb'^(\d{2}:\d{2}:\d{2}:\d{3,4})[ \t]+'  # timestamp
+               rb'(Tx|Rx)[ \t]+'                      # direction
+               rb'(\d+)[ \t]+'                        # channel
+               rb'(0x[0-9A-Fa-f]+)[ \t]+'             # CAN ID
+               rb'(.)[ \t]+'                          # extended flag
+               rb'(\d+)(?:[ \t]+|\r?$)'               # DLC
+               rb'((?:[0-9A-Fa-f]{2}[ \t]*)*)',        # data bytes
+               re.MULTILINE),
+
+    # PCAN-View v4.2.1.533
+    re.compile(rb'^[ \t]+\d+\)?'                        # line number
+               rb'[ \t]+([\d\.]*)'                     # timestamp (relative ms)
+               rb'[ \t]+([A-Za-z]*)'                   # message type
+               rb'[ \t]+([0-9A-F]*)'                   # CAN ID
+               rb'[ \t]+([A-Za-z]*)'                   # direction
+               rb'[ \t]+(\d)(?:[ \t]+|\r?$)'           # DLC
+               rb'((?:[0-9A-Fa-f]{2}[ \t]*){0,8})\r?$',  # data bytes
+               re.MULTILINE),
+
+    # CL2000
+    re.compile(rb'^([\d\._:]+);'                      # timestamp
+               rb'(.+);'                              # message type
+               rb'([0-9A-Fa-f]+);'                    # CAN ID
+               rb'([0-9A-Fa-f]*)',                    # data bytes
+               re.MULTILINE)
+]
+
+# Log body patterns: a log line, or any other line in the "other" group
+_LOG_BODY_RES = [
+    re.compile(rb'(?:' + log_re.pattern + rb')|^(?P<other>.*)$', re.MULTILINE)
+    for log_re in _LOG_RES
+]
+
 
 class log_formats(Enum):
     """Supported log file formats"""
@@ -56,6 +134,7 @@ class CANMessage:
     extended: bool          # Extended frame flag
     dlc: int               # Data Length Code
     data: bytes
+    data_u64: int = 0      # data as little endian integer
 
 
 @dataclass
@@ -71,6 +150,9 @@ class DBCSignal:
     minimum: float
     maximum: float
     unit: str
+    effective_start_bit: int = 0    # Intel start bit (Motorola converted)
+    mask: int = 0                   # (1 << size) - 1
+    sign_bit: int = 0               # Most significant bit for signed signals, 0 otherwise
 
 
 @dataclass
@@ -83,6 +165,7 @@ class DBCMessage:
     signals: Dict[str, DBCSignal]
     counter: int
     pulse: bool
+    signal_arrays: Dict[str, tuple] = field(default_factory=dict)   # Signal attributes by name, see build_signal_arrays()
 
 
 class DBCParser:
@@ -98,7 +181,13 @@ class DBCParser:
 
     def parse_file(self, dbc_file: str):
         """Parse a single DBC file"""
+        self.messages.update(self.parse_content(dbc_file))
+        print(f"Parsed {len(self.messages)} messages from {dbc_file}")
+
+    def parse_content(self, dbc_file: str) -> Dict[int, DBCMessage]:
+        """Parse the messages of a single DBC file"""
         print(f"Parsing DBC file: {dbc_file}")
+        messages = {}
 
         try:
             with open(dbc_file, 'r', encoding='utf-8') as f:
@@ -108,57 +197,57 @@ class DBCParser:
             with open(dbc_file, 'r', encoding='latin-1') as f:
                 content = f.read()
 
-        # Regex patterns for DBC parsing
-        # Message pattern: BO_ <ID> <MessageName>: <DLC> <Sender>
-        message_pattern = r'BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s+(\w+)'
-
-        # Signal pattern: SG_ <SignalName> : <StartBit>|<Size>@<Endianness><Sign> (<Factor>,<Offset>) [<Min>|<Max>] "<Unit>" <Receivers>
-        signal_pattern = r'SG_\s+(\w+)\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*\(\s*([-+]?\d*\.?\d*)\s*,\s*([-+]?\d*\.?\d*)\s*\)\s*\[\s*([-+]?\d*\.?\d*)\s*\|\s*([-+]?\d*\.?\d*)\s*\]\s*"([^"]*)"\s*(.*)'
-
-        lines = content.split('\n')
         current_message = None
 
-        for line in lines:
-            line = line.strip()
-
+        for match in _DBC_RE.finditer(content):
             # Parse message
-            message_match = re.match(message_pattern, line)
-            if message_match:
-                can_id = int(message_match.group(1))
+            if match.group('id') is not None:
+                can_id = int(match.group('id'))
                 extended = int(can_id > 2047)
-                name = message_match.group(2)
-                dlc = int(message_match.group(3))
+                name = match.group('mname')
+                dlc = int(match.group('dlc'))
                 current_message = DBCMessage(can_id=can_id, name=name, dlc=dlc, extended=extended, signals={}, counter = 0, pulse=False)
-                self.messages[can_id] = current_message
+                messages[can_id] = current_message
                 continue
 
             # Parse signal
-            signal_match = re.match(signal_pattern, line)
-            if signal_match and current_message:
-                signal_name = signal_match.group(1)
-                start_bit = int(signal_match.group(2))
-                size = int(signal_match.group(3))
-                is_little_endian = signal_match.group(4) == '1'
-                is_signed = signal_match.group(5) == '-'
+            if current_message:
+                signal_name = match.group('sname')
+                start_bit = int(match.group('sb'))
+                size = int(match.group('sz'))
+                is_little_endian = match.group('end') == '1'
+                is_signed = match.group('sgn') == '-'
 
                 try:
-                    factor = float(signal_match.group(6)) if signal_match.group(6) else 1.0
-                    offset = float(signal_match.group(7)) if signal_match.group(7) else 0.0
-                    minimum = float(signal_match.group(8)) if signal_match.group(8) else 0.0
-                    maximum = float(signal_match.group(9)) if signal_match.group(9) else 0.0
+                    factor = float(match.group('f')) if match.group('f') else 1.0
+                    offset = float(match.group('o')) if match.group('o') else 0.0
+                    minimum = float(match.group('mn')) if match.group('mn') else 0.0
+                    maximum = float(match.group('mx')) if match.group('mx') else 0.0
                 except ValueError:
                     factor, offset, minimum, maximum = 1.0, 0.0, 0.0, 0.0
 
-                unit = signal_match.group(10)
+                unit = match.group('u')
+
+                # Precompute the bit position used by the decoder
+                if is_little_endian:
+                    # Intel format (little endian)
+                    effective_start_bit = start_bit
+                else:
+                    # Motorola format (big endian)
+                    # Convert bit position from Motorola to Intel
+                    effective_start_bit = (start_bit // 8) * 8 + (7 - start_bit % 8) - size + 1
+                mask = (1 << size) - 1
+                sign_bit = 1 << (size - 1) if is_signed and size else 0
 
                 signal = DBCSignal(
                     signal_name, start_bit, size, is_little_endian,
-                    is_signed, factor, offset, minimum, maximum, unit
+                    is_signed, factor, offset, minimum, maximum, unit,
+                    effective_start_bit, mask, sign_bit
                 )
 
                 current_message.signals[signal_name] = signal
 
-        print(f"Parsed {len(self.messages)} messages from {dbc_file}")
+        return messages
 
 
 class MultiFormatLogParser:
@@ -166,52 +255,22 @@ class MultiFormatLogParser:
 
     def __init__(self):
         # File type detection patterns
-        self.file_type = \
-        [
-            r'\*\*\*BUSMASTER Ver 3\.2\.2\*\*\*',
-            r';\s+Generated by PCAN-View.*',
-            r'# Logger type: CL2000'
-        ]
+        self.file_type = _FILE_TYPE_RES
 
         # Start date/time patterns for each format
-        self.start_date_patterns = [
-            r'\*\*\*START DATE AND TIME (\d+:\d+:\d+)\s+.*\*\*\*',  # BusMaster
-            r';\s+Start time:\s+(\d{2}/\d{2}/\d+ \d{2}:\d{2}:\d+\.\d+)\..*',  # PCAN-View
-            r''  # CL2000 (timestamp is absolute)
-        ]
+        self.start_date_patterns = _START_DATE_RES
 
         # Log line patterns for each format
-        self.log_patterns = [
-            # BusMaster Ver 3.2.2
-            (r'(\d{2}:\d{2}:\d{2}:\d{3,4})\s+'      # timestamp
-             r'(Tx|Rx)\s+'                          # direction
-             r'(\d+)\s+'                            # channel
-             r'(0x[0-9A-Fa-f]+)\s+'                 # CAN ID
-             r'(.)\s+'                              # extended flag
-             r'(\d+)\s+'                            # DLC
-             r'((?:[0-9A-Fa-f]{2}\s*)*)'),          # data bytes
-
-            # PCAN-View v4.2.1.533
-            (r'^\s+\d+\)?'                          # line number
-             r'\s+([\d\.]*)'                        # timestamp (relative ms)
-             r'\s+([A-Za-z]*)'                      # message type
-             r'\s+([0-9A-F]*)'                      # CAN ID
-             r'\s+([A-Za-z]*)'                      # direction
-             r'\s+(\d)'                             # DLC
-             r'\s+((?:[0-9A-Fa-f]{2}\s){0,8})$'),  # data bytes
-
-            # CL2000
-            (r'([\d\._:]+);'                        # timestamp
-             r'(.+);'                               # message type
-             r'([0-9A-Fa-f]+);'                     # CAN ID
-             r'([0-9A-Fa-f]*)')                     # data bytes
-        ]
+        self.log_patterns = _LOG_RES
 
         # Parser state
         self.log_format = None
         self.log_pattern = None
         self.start_date = None
         self.start_date_format = None
+        self.warning_count = 0
+        self.warnings = []
+        self.skipped_count = 0
 
     def _reset_parser_state(self):
         """Reset parser state for new file"""
@@ -219,9 +278,80 @@ class MultiFormatLogParser:
         self.log_pattern = None
         self.start_date = None
         self.start_date_format = None
+        self.warning_count = 0
+        self.warnings = []
+        self.skipped_count = 0
+
+    def _add_warning(self, line_num: int, text: str):
+        """Count a parse warning, keeping the first MAX_PARSE_WARNINGS_SHOWN for the summary"""
+        self.warning_count += 1
+        if len(self.warnings) < MAX_PARSE_WARNINGS_SHOWN:
+            self.warnings.append((line_num, text))
+
+    def _print_warnings(self):
+        """Print the summary of the parse warnings"""
+        if not self.warning_count:
+            return
+        print(f"{self.warning_count} parse warnings ({len(self.warnings)} shown):")
+        for line_num, text in sorted(self.warnings):
+            print(f"Warning: {text}")
+
+    def _detect_format(self, content: bytes) -> Tuple[int, int]:
+        """Detect log format and start date, return offset and number of the first log line (-1 if none)"""
+        offset = 0
+        line_num = 0
+        size = len(content)
+        while offset < size:
+            line_start = offset
+            offset = content.find(b'\n', offset) + 1 or size
+            line = content[line_start:offset]
+            line_num += 1
+
+            # Detect log format and start date if not yet determined
+            if not self.start_date:
+                for form, start_date_format in enumerate(self.start_date_patterns):
+                    xmatch = start_date_format.match(line)
+                    if xmatch:
+                        if form == log_formats.BUSMASTER_3_2_2.value:
+                            tmp_str = xmatch.group(1)
+                            self.start_date_format = start_date_format
+                            self.start_date = datetime.strptime(tmp_str.decode(), "%d:%m:%Y")
+                            break
+
+                        elif form == log_formats.PCANView_4_2_1_533.value:
+                            tmp_str = xmatch.group(1)
+                            self.start_date = datetime.strptime(tmp_str.decode(), "%d/%m/%Y %H:%M:%S.%f")
+                            break
 
-    def parse_file(self, log_file: str) -> List[CANMessage]:
-        """Parse log file and return a list of CAN messages"""
+                        elif form == log_formats.CL2000.value:
+                            break
+                if not xmatch:
+                    continue
+            elif self.start_date_format:
+                xmatch = self.start_date_format.match(line)
+                if xmatch:
+                    if form == log_formats.BUSMASTER_3_2_2.value:
+                        tmp_str = xmatch.group(1)
+                        self.start_date = datetime.strptime(tmp_str.decode(), "%d:%m:%Y")
+                        continue
+
+                    elif form == log_formats.PCANView_4_2_1_533.value:
+                        tmp_str = xmatch.group(1)
+                        self.start_date = datetime.strptime(tmp_str.decode(), "%d/%m/%Y %H:%M:%S.%f")
+                        continue
+                    continue
+
+            for form, log_pattern in enumerate(self.log_patterns):
+                xmatch = log_pattern.match(line)
+                if xmatch:
+                    self.log_format = int(form)
+                    self.log_pattern = log_pattern
+                    return line_start, line_num
+
+        return -1, line_num
+
+    def parse_file(self, log_file: str, known_ids: Optional[Set[int]] = None) -> List[CANMessage]:
+        """Parse log file and return a list of CAN messages, only those in known_ids if given"""
         messages = []
 
         print(f"Parsing log file: {log_file}")
@@ -229,125 +359,127 @@ class MultiFormatLogParser:
         # Reset parser state
         self._reset_parser_state()
 
-        with open(log_file, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                # line = line.strip()
-                if not line:
-                    continue
+        if os.path.getsize(log_file) == 0:
+            self._print_parsed(messages)
+            return messages
 
-                # Detect log format and start date if not yet determined
-                if not self.start_date:
-                    for form, start_date_format in enumerate(self.start_date_patterns):
-                        xmatch = re.match(start_date_format, line)
-                        if xmatch:
-                            if form == log_formats.BUSMASTER_3_2_2.value:
-                                tmp_str = xmatch.group(1)
-                                self.start_date_format = start_date_format
-                                self.start_date = datetime.strptime(tmp_str, "%d:%m:%Y")
-                                break
-
-                            elif form == log_formats.PCANView_4_2_1_533.value:
-                                tmp_str = xmatch.group(1)
-                                self.start_date = datetime.strptime(tmp_str, "%d/%m/%Y %H:%M:%S.%f")
-                                break
-
-                            elif form == log_formats.CL2000.value:
-                                break
-                    if not xmatch:
-                        continue
-                elif self.start_date_format:
-                    xmatch = re.match(self.start_date_format, line)
-                    if xmatch:
-                        if form == log_formats.BUSMASTER_3_2_2.value:
-                            tmp_str = xmatch.group(1)
-                            self.start_date = datetime.strptime(tmp_str, "%d:%m:%Y")
-                            continue
-
-                        elif form == log_formats.PCANView_4_2_1_533.value:
-                            tmp_str = xmatch.group(1)
-                            self.start_date = datetime.strptime(tmp_str, "%d/%m/%Y %H:%M:%S.%f")
-                            continue
-                        continue
+        with open(log_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            pos, first_line_num = self._detect_format(content)
+            if pos >= 0:
+                self._parse_body(content, pos, first_line_num, messages, known_ids)
 
-                if not self.log_pattern:
-                    for form, log_pattern in enumerate(self.log_patterns):
-                        xmatch = re.match(log_pattern, line)
-                        if xmatch:
-                            self.log_format = int(form)
-                            self.log_pattern = log_pattern
-                            break
-                    if not xmatch:
-                        continue
+        self._print_warnings()
+        self._print_parsed(messages)
+        return messages
 
-                match = re.match(self.log_pattern, line)
-                if match:
-                    if self.log_format == log_formats.BUSMASTER_3_2_2.value:
-                        tstr = match.group(1)
-                        t1 = self.start_date
-                        h, m, s, ms = tstr.split(":")
-                        s = s + '.' + ms
-                        h, m, s = int(h), int(m), float(s)
-                        delta = timedelta(hours=h, minutes=m, seconds=s) #, milliseconds=ms)
-                        t2 = t1 + delta
-                        timestamp = t2.strftime(TIME_STAMP_OUTPUT)[:-2]
-                        direction = match.group(2)
-                        channel = int(match.group(3))
-                        can_id = int(match.group(4), 16)  # Convert from hex
-                        extended = int(match.group(5) == 'x')
-                        dlc = int(match.group(6))
-                        data_str = match.group(7).strip()
-                    elif self.log_format == log_formats.PCANView_4_2_1_533.value:
-                        tstr = match.group(1)
-                        t1 = self.start_date
-                        ms = float(tstr)
-                        delta = timedelta(hours=0, minutes=0, seconds=0, milliseconds=ms)
-                        t2 = t1 + delta
-                        timestamp = t2.strftime(TIME_STAMP_OUTPUT)[:-2]
-                        direction = match.group(4)
-                        ID = match.group(3)
-                        can_id = int(ID, 16)  # Convert from hex
-                        extended = int(len(ID) > 4)
-                        channel = 0
-                        dlc = int(match.group(5))
-                        data_str = match.group(6).strip()
-                    elif self.log_format == log_formats.CL2000.value:
-                        tstr = match.group(1)
-
-                        tstr = datetime.strptime(tstr, TIME_STAMP_OUTPUT)[:-2]
-                        timestamp = tstr
-                        direction = 'Rx'
-
-                        extended = int(match.group(2))
-                        channel = 0
-                        can_id = int(match.group(3), 16)
-                        data_str = match.group(4).strip()
-                        dlc = int(len(data_str)/2)
-
-                    # Convert hex data to bytes
-                    if data_str:
-                        data_bytes = bytes.fromhex(data_str.replace(' ', ''))
-                    else:
-                        data_bytes = b''
-
-                    # Verify that DLC matches data length
-                    if len(data_bytes) != dlc:
-                        print(f"Warning: DLC mismatch at line {line_num}: expected {dlc}, got {len(data_bytes)}")
-
-                    message = CANMessage(
-                        timestamp=timestamp,
-                        direction=direction,
-                        channel=channel,
-                        can_id=can_id,
-                        extended=extended,
-                        dlc=dlc,
-                        data=data_bytes)
-
-                    messages.append(message)
+    def _print_parsed(self, messages: List[CANMessage]):
+        """Print the number of parsed CAN messages, and of those skipped for their ID"""
+        if self.skipped_count:
+            print(f"Parsed {len(messages)} CAN messages "
+                  f"({self.skipped_count} with IDs not in the DBC files skipped)")
+        else:
+            print(f"Parsed {len(messages)} CAN messages")
+
+    def _parse_body(self, content: bytes, pos: int, first_line_num: int, messages: List[CANMessage],
+                    known_ids: Optional[Set[int]] = None):
+        """Parse the log lines from pos onwards, appending them to messages"""
+        size = len(content)
+
+        # CAN logs repeat a small set of IDs, convert each hex ID only once
+        id_cache: Dict[bytes, int] = {}
+
+        for line_num, match in enumerate(_LOG_BODY_RES[self.log_format].finditer(content, pos), first_line_num):
+            if match.lastgroup == 'other':
+                line = match.group('other')
+                if not line and match.start() == size:
+                    break  # Empty match after the last newline
+
+                # BusMaster logs may restart the session with a new start date
+                xmatch = self.start_date_format.match(line) if self.start_date_format else None
+                if xmatch:
+                    self.start_date = datetime.strptime(xmatch.group(1).decode(), "%d:%m:%Y")
                 else:
-                    print(f"Warning: Could not parse line {line_num}: {line}")
+                    self._add_warning(line_num, f"Could not parse line {line_num}: {line.decode('latin-1').rstrip()}")
+                continue
 
-        print(f"Parsed {len(messages)} CAN messages")
-        return messages
+            if self.log_format == log_formats.BUSMASTER_3_2_2.value:
+                ID = match.group(4)
+                can_id = id_cache.get(ID)
+                if can_id is None:
+                    can_id = id_cache[ID] = int(ID, 16)  # Convert from hex
+                if known_ids is not None and can_id not in known_ids:
+                    self.skipped_count += 1
+                    continue  # Unknown CAN ID, skip the timestamp and data conversion
+                tstr = match.group(1)
+                t1 = self.start_date
+                h, m, s, ms = tstr.split(b":")
+                s = s + b'.' + ms
+                h, m, s = int(h), int(m), float(s)
+                delta = timedelta(hours=h, minutes=m, seconds=s) #, milliseconds=ms)
+                t2 = t1 + delta
+                timestamp = t2.strftime(TIME_STAMP_OUTPUT)[:-2]
+                direction = match.group(2).decode()
+                channel = int(match.group(3))
+                extended = int(match.group(5) == b'x')
+                dlc = int(match.group(6))
+                data_str = match.group(7)
+            elif self.log_format == log_formats.PCANView_4_2_1_533.value:
+                ID = match.group(3)
+                can_id = id_cache.get(ID)
+                if can_id is None:
+                    can_id = id_cache[ID] = int(ID, 16)  # Convert from hex
+                if known_ids is not None and can_id not in known_ids:
+                    self.skipped_count += 1
+                    continue  # Unknown CAN ID, skip the timestamp and data conversion
+                tstr = match.group(1)
+                t1 = self.start_date
+                ms = float(tstr)
+                delta = timedelta(hours=0, minutes=0, seconds=0, milliseconds=ms)
+                t2 = t1 + delta
+                timestamp = t2.strftime(TIME_STAMP_OUTPUT)[:-2]
+                direction = match.group(4).decode()
+                extended = int(len(ID) > 4)
+                channel = 0
+                dlc = int(match.group(5))
+                data_str = match.group(6)
+            elif self.log_format == log_formats.CL2000.value:
+                can_id = int(match.group(3), 16)
+                if known_ids is not None and can_id not in known_ids:
+                    self.skipped_count += 1
+                    continue  # Unknown CAN ID, skip the timestamp and data conversion
+                tstr = match.group(1)
+
+                tstr = datetime.strptime(tstr.decode(), TIME_STAMP_OUTPUT)[:-2]
+                timestamp = tstr
+                direction = 'Rx'
+
+                extended = int(match.group(2))
+                channel = 0
+                data_str = match.group(4).strip()
+                dlc = int(len(data_str)/2)
+
+            # Convert hex data to bytes (fromhex skips the blanks between bytes)
+            data_bytes = bytes.fromhex(data_str.decode('ascii'))
+
+            # Payload as little endian integer, decoded once for all its signals
+            # (from_bytes zero extends, no need to pad to 8 bytes)
+            data_u64 = int.from_bytes(data_bytes, 'little')
+
+            # Verify that DLC matches data length
+            if len(data_bytes) != dlc:
+                self._add_warning(line_num, f"DLC mismatch at line {line_num}: expected {dlc}, got {len(data_bytes)}")
+
+            message = CANMessage(
+                timestamp=timestamp,
+                direction=direction,
+                channel=channel,
+                can_id=can_id,
+                extended=extended,
+                dlc=dlc,
+                data=data_bytes,
+                data_u64=data_u64)
+
+            messages.append(message)
 
 
 class SignalDecoder:
@@ -359,34 +491,56 @@ class SignalDecoder:
         if len(data) == 0:
             return None
 
-        try:
-            # Convert data to 64-bit integer
-            data_padded = data + b'\x00' * (8 - len(data))  # Pad to 8 bytes
-            data_int = int.from_bytes(data_padded, byteorder='little')
-
-            # Calculate bit position considering endianness
-            if signal.is_little_endian:
-                # Intel format (little endian)
-                start_bit = signal.start_bit
-            else:
-                # Motorola format (big endian)
-                # Convert bit position from Motorola to Intel
-                byte_pos = signal.start_bit // 8
-                bit_pos = signal.start_bit % 8
-                start_bit = byte_pos * 8 + (7 - bit_pos) - signal.size + 1
-
-            # Extract bits
-            mask = (1 << signal.size) - 1
+        # Convert data to integer (zero extended, same as padding to 8 bytes)
+        data_int = int.from_bytes(data, byteorder='little')
+
+        return SignalDecoder.extract_signal_value_from_int(data_int, signal)
+
+    @staticmethod
+    def extract_message_fields(data: bytes, data_int: int, message: DBCMessage,
+                               format_field: Callable[[float], str]) -> List[Optional[str]]:
+        """Extract the formatted values of all signals of a DBC message, in the order of its signal_arrays"""
+        arrays = message.signal_arrays
+        if len(data) == 0:
+            return [None] * len(arrays['name'])
+
+        fields = []
+        for start_bit, mask, sign_bit, factor, offset, field_lut in zip(
+                arrays['start_bit'], arrays['mask'], arrays['sign_bit'],
+                arrays['factor'], arrays['offset'], arrays['field_lut']):
             raw_value = (data_int >> start_bit) & mask
 
+            # Small signals: formatted value looked up by raw value
+            if field_lut is not None:
+                fields.append(field_lut[raw_value])
+                continue
+
             # Handle sign if necessary
-            if signal.is_signed and raw_value & (1 << (signal.size - 1)):
-                raw_value -= (1 << signal.size)
+            if raw_value & sign_bit:
+                raw_value -= sign_bit << 1
+
+            fields.append(format_field(raw_value * factor + offset))
+
+        return fields
+
+    @staticmethod
+    def decode_bits(data_int: int, start_bit: int, mask: int, sign_bit: int,
+                    factor: float, offset: float) -> float:
+        """Extract the bits at start_bit from data_int and apply sign, scaling factor and offset"""
+        raw_value = (data_int >> start_bit) & mask
+
+        # Handle sign if necessary
+        if raw_value & sign_bit:
+            raw_value -= sign_bit << 1
 
-            # Apply scaling factor and offset
-            physical_value = raw_value * signal.factor + signal.offset
+        return raw_value * factor + offset
 
-            return physical_value
+    @staticmethod
+    def extract_signal_value_from_int(data_int: int, signal: DBCSignal) -> Optional[float]:
+        """Extract signal value from CAN data converted to a little endian integer"""
+        try:
+            return SignalDecoder.decode_bits(data_int, signal.effective_start_bit, signal.mask, signal.sign_bit,
+                                             signal.factor, signal.offset)
 
         except Exception as e:
             print(f"Error decoding signal {signal.name}: {e}")
@@ -398,6 +552,64 @@ def get_pulser_name(DBC_message_name):
 def get_counter_name(DBC_message_name):
     return '_' + DBC_message_name + '_Counter'
 
+def get_signal_column_name(DBC_message_name, signal_name):
+    if SETUP.signal_name == signal_name_mode.SIGNAL_NAME.value:
+        return signal_name
+    return DBC_message_name + '.' + signal_name
+
+
+def build_field_lut(signal: DBCSignal, format_field: Callable[[float], str],
+                    field_luts: Dict[tuple, Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+    """Formatted values of a small signal for every raw value, None for signals over FIELD_LUT_MAX_BITS
+
+    Signals with the same mask, sign bit, factor and offset share the same table, kept in field_luts
+    """
+    if signal.size > FIELD_LUT_MAX_BITS:
+        return None
+    key = (signal.mask, signal.sign_bit, signal.factor, signal.offset)
+    field_lut = field_luts.get(key)
+    if field_lut is None:
+        field_lut = field_luts[key] = tuple(
+            format_field(SignalDecoder.decode_bits(raw_value, 0, signal.mask, signal.sign_bit,
+                                                   signal.factor, signal.offset))
+            for raw_value in range(signal.mask + 1))
+    return field_lut
+
+
+def build_signal_arrays(dbc_message: DBCMessage, signal_index_map: Dict[str, int],
+                        format_field: Callable[[float], str], field_luts: Dict[tuple, Tuple[str, ...]]):
+    """Store the decoding attributes of the message signals as parallel tuples, one per attribute"""
+    signals = []
+    for signal in dbc_message.signals.values():
+        # Reported once here instead of failing on every decoded message
+        if signal.effective_start_bit < 0:
+            print(f"Error decoding signal {signal.name}: start bit out of the message "
+                  f"({signal.start_bit}|{signal.size}), signal not decoded")
+            continue
+        signals.append(signal)
+
+    dbc_message.signal_arrays = {
+        'name': tuple(signal.name for signal in signals),
+        'start_bit': tuple(signal.effective_start_bit for signal in signals),
+        'mask': tuple(signal.mask for signal in signals),
+        'sign_bit': tuple(signal.sign_bit for signal in signals),
+        'factor': tuple(signal.factor for signal in signals),
+        'offset': tuple(signal.offset for signal in signals),
+        'field_lut': tuple(build_field_lut(signal, format_field, field_luts) for signal in signals),
+        'csv_col': tuple(signal_index_map[get_signal_column_name(dbc_message.name, signal.name)]
+                         for signal in signals),
+    }
+
+
+def format_csv_field(value: Any, quote_pattern: re.Pattern) -> str:
+    """Format a CSV field as csv.writer does, quoting it only when it contains special characters"""
+    if value is None:
+        return ''
+    text = str(value)
+    if quote_pattern.search(text):
+        text = '"' + text.replace('"', '""') + '"'
+    return text
+
 
 def convert_log_to_csv(log_file: str, dbc_files: List[str], output_file: str):
     """Convert CAN log file to CSV using DBC files"""
@@ -410,18 +622,23 @@ def convert_log_to_csv(log_file: str, dbc_files: List[str], output_file: str):
         print("Error: No messages found in DBC files")
         return
 
-    dbc_parser_messages_ID = []
+    dbc_parser_messages_ID = set()
     for msg in dbc_parser.messages:
         dbc_message = dbc_parser.messages[msg]
         tmp_str = str(dbc_message.can_id) + '|' + str(dbc_message.extended) + '|' + str(dbc_message.dlc)
-        dbc_parser_messages_ID.append(tmp_str)
+        dbc_parser_messages_ID.add(tmp_str)
 
     # Parse log file
     log_parser = MultiFormatLogParser()
-    can_messages = log_parser.parse_file(log_file)
+    # CAN messages not defined in the DBC files are dropped while parsing
+    can_messages = log_parser.parse_file(log_file, known_ids=set(dbc_parser.messages))
 
     if not can_messages:
-        print("Error: No CAN messages found in log file")
+        if log_parser.skipped_count:
+            print(f"Error: None of the {log_parser.skipped_count} CAN messages in the log file "
+                  f"match the DBC files")
+        else:
+            print("Error: No CAN messages found in log file")
         return
 
     # Collect all unique signal names
@@ -432,14 +649,29 @@ def convert_log_to_csv(log_file: str, dbc_files: List[str], output_file: str):
         if SETUP.msg_pulser_signal:
             all_signals.add(get_pulser_name(dbc_message.name))
         for signal_name in dbc_message.signals.keys():
-            if SETUP.signal_name == signal_name_mode.SIGNAL_NAME.value:
-                all_signals.add(signal_name)
-            else:
-                all_signals.add(dbc_message.name + '.' + signal_name)
+            all_signals.add(get_signal_column_name(dbc_message.name, signal_name))
 
-    all_signals = sorted(list(all_signals))
+    all_signals = sorted(all_signals)
     print(f"Found {len(all_signals)} unique signals")
 
+    # CSV column of each signal
+    signal_index_map = {name: i + 1 for i, name in enumerate(all_signals)}  # +1 for timestamp
+
+    # Signals up to FIELD_LUT_MAX_BITS take their field from a table built
+    # once, larger ones are formatted on every decoded message. Rows are
+    # joined by hand and written in batches
+    quote_pattern = re.compile('[' + re.escape(SETUP.delimiter + '"' + CSV_LINE_TERMINATOR) + ']')
+    format_field = functools.partial(format_csv_field, quote_pattern=quote_pattern)
+    lines = []
+
+    # Decoding layout only for the DBC messages present in the log, with the
+    # field tables shared between signals of the same kind
+    field_luts: Dict[tuple, Tuple[str, ...]] = {}
+    log_ids = {can_message.can_id for can_message in can_messages}
+    for dbc_message in dbc_parser.messages.values():
+        if dbc_message.can_id in log_ids:
+            build_signal_arrays(dbc_message, signal_index_map, format_field, field_luts)
+
     # Prepare CSV header
     csv_header = ['time'] + all_signals
     #csv_header.append("")
@@ -447,67 +679,75 @@ def convert_log_to_csv(log_file: str, dbc_files: List[str], output_file: str):
     # Process messages and write CSV
     decoder = SignalDecoder()
 
-    with open(output_file, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile, delimiter=SETUP.delimiter, lineterminator = ';\r\n')
-        writer.writerow(csv_header)
-        rrow = 0
+    with open(output_file, 'w', newline='', buffering=1 << 20) as csvfile:
+        csvfile.write(SETUP.delimiter.join(format_csv_field(name, quote_pattern) for name in csv_header)
+                      + CSV_LINE_TERMINATOR)
 
-        for can_message in can_messages:
-            # Initialize row with timestamp and empty values
-            if rrow == 0:
-                row = [can_message.timestamp] + [None] * len(all_signals)
-            else:
-                row[0] = can_message.timestamp
+        # Signals hold their last value from one row to the next: the same row
+        # is updated in place and written once per timestamp, after all the CAN
+        # messages sharing that timestamp have been decoded
+        row = [''] * (len(all_signals) + 1)
+        current_timestamp = None
 
-            if SETUP.msg_pulser_signal:
-                for CAN_id, dbc_message in enumerate(dbc_parser.messages):
-                    if dbc_parser.messages[dbc_message].pulse:
-                        signal_name = get_pulser_name(dbc_parser.messages[dbc_message].name)
-                        signal_index = all_signals.index(signal_name) + 1  # +1 for timestamp
-                        value = 0
-                        if value is not None:
-                            row[signal_index] = value
-                    dbc_parser.messages[dbc_message].pulse = False
-
-            # If CAN message has corresponding DBC definition
+        for can_message in can_messages:
+            # Skip CAN messages without corresponding DBC definition, they would
+            # only repeat the previous row
             can_message_ID = str(can_message.can_id) + '|' + str(can_message.extended) + '|' + str(can_message.dlc)
+            if can_message_ID not in dbc_parser_messages_ID:
+                continue
 
-            if can_message_ID in dbc_parser_messages_ID:
-                dbc_message = dbc_parser.messages[can_message.can_id]
-
-                dbc_parser.messages[can_message.can_id].counter += 1
-                dbc_parser.messages[can_message.can_id].pulse = True
+            if can_message.timestamp != current_timestamp:
+                # New timestamp: write the row of the previous one
+                if current_timestamp is not None:
+                    lines.append(SETUP.delimiter.join(row))
+                    if len(lines) >= CSV_BATCH_ROWS:
+                        csvfile.write(CSV_LINE_TERMINATOR.join(lines) + CSV_LINE_TERMINATOR)
+                        lines.clear()
 
-                if SETUP.msg_counter_signal:
-                    signal_name = get_counter_name(dbc_message.name)
-                    signal_index = all_signals.index(signal_name) + 1  # +1 for timestamp
-                    value = dbc_parser.messages[can_message.can_id].counter
-                    if value is not None:
-                        row[signal_index] = value
+                current_timestamp = can_message.timestamp
+                row[0] = format_csv_field(current_timestamp, quote_pattern)
 
                 if SETUP.msg_pulser_signal:
-                    signal_name = get_pulser_name(dbc_message.name)
-                    signal_index = all_signals.index(signal_name) + 1  # +1 for timestamp
-                    value = 1
-                    if value is not None:
-                        row[signal_index] = value
-
-                # Decode all signals in the message
-                for signal_name, signal in dbc_message.signals.items():
-                    if SETUP.signal_name == signal_name_mode.SIGNAL_NAME.value:
-                        signal_name_extended = signal_name
-                    else:
-                        signal_name_extended = dbc_message.name + '.' + signal_name
-
-                    if signal_name_extended in all_signals:
-                        signal_index = all_signals.index(signal_name_extended) + 1  # +1 for timestamp
-                        value = decoder.extract_signal_value(can_message.data, signal)
-                        rrow += 1
-                        if value is not None:
-                            row[signal_index] = value
-
-            #row.append("")
-            writer.writerow(row)
+                    for CAN_id, dbc_message in enumerate(dbc_parser.messages):
+                        if dbc_parser.messages[dbc_message].pulse:
+                            signal_name = get_pulser_name(dbc_parser.messages[dbc_message].name)
+                            signal_index = signal_index_map[signal_name]
+                            value = 0
+                            if value is not None:
+                                row[signal_index] = format_csv_field(value, quote_pattern)
+                        dbc_parser.messages[dbc_message].pulse = False
+
+            dbc_message = dbc_parser.messages[can_message.can_id]
+
+            dbc_parser.messages[can_message.can_id].counter += 1
+            dbc_parser.messages[can_message.can_id].pulse = True
+
+            if SETUP.msg_counter_signal:
+                signal_name = get_counter_name(dbc_message.name)
+                signal_index = signal_index_map[signal_name]
+                value = dbc_parser.messages[can_message.can_id].counter
+                if value is not None:
+                    row[signal_index] = format_csv_field(value, quote_pattern)
+
+            if SETUP.msg_pulser_signal:
+                signal_name = get_pulser_name(dbc_message.name)
+                signal_index = signal_index_map[signal_name]
+                value = 1
+                if value is not None:
+                    row[signal_index] = format_csv_field(value, quote_pattern)
+
+            # Decode all signals in the message
+            fields = decoder.extract_message_fields(can_message.data, can_message.data_u64, dbc_message, format_field)
+            for signal_index, text in zip(dbc_message.signal_arrays['csv_col'], fields):
+                if text is not None:
+                    row[signal_index] = text
+
+        #row.append("")
+        if current_timestamp is not None:
+            lines.append(SETUP.delimiter.join(row))
+
+        if lines:
+            csvfile.write(CSV_LINE_TERMINATOR.join(lines) + CSV_LINE_TERMINATOR)
 
     print(f"CSV file created: {output_file}")
 